@@ -2,121 +2,728 @@
 # -*- coding: utf-8 -*-
 """
 Programme pour supprimer les fichiers en double dans un ou plusieurs répertoires.
-Parcourt récursivement tous les sous-répertoires et identifie les doublons par leur contenu (hash MD5).
+Parcourt récursivement tous les sous-répertoires et identifie les doublons par leur contenu (empreinte BLAKE3, ou BLAKE2b à défaut).
 """
 
 import os
 import sys
+import mmap
 import hashlib
+import sqlite3
+import threading
+import time
 import argparse
-from collections import defaultdict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from functools import partial
+from itertools import chain, groupby
+from operator import itemgetter
 from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
 
-def regrouper_par_taille(fichiers: list[Path]) -> dict[int, list[Path]]:
+try:
+    import blake3
+except ImportError:  # dépendance optionnelle, BLAKE2b (bibliothèque standard) sinon
+    blake3 = None
+
+try:
+    import xxhash
+except ImportError:  # dépendance optionnelle, BLAKE2b pour les échantillons sinon
+    xxhash = None
+
+ALGO_HASH = "BLAKE3" if blake3 is not None else "BLAKE2b"
+# Simple empreinte de contenu, sans usage cryptographique: usedforsecurity=False
+# l'autorise aussi sur les Python construits en mode FIPS
+nouveau_hasher = partial(hashlib.blake2b, digest_size=16, usedforsecurity=False)
+# Un échantillon partiel ne fait qu'écarter des fichiers: une collision coûte une
+# comparaison de plus, jamais une suppression. XXH3 suffit, et va bien plus vite.
+# Ce qui confirme un doublon (contenu complet) reste hashé par BLAKE3 ou BLAKE2b.
+hasher_echantillon = xxhash.xxh3_128 if xxhash is not None else nouveau_hasher
+# Empreinte d'un contenu complet, celle enregistrée dans le cache
+hasher_complet = blake3.blake3 if blake3 is not None else nouveau_hasher
+
+# Taille des blocs lus pour le calcul des hash: moins d'appels read()/update() par Mo
+TAILLE_BLOC = 4 * 1024 * 1024
+# Au-delà, le fichier est projeté en mémoire et hashé en un seul appel à update()
+SEUIL_MMAP = 64 * 1024 * 1024
+# Début de fichier préchargé par le noyau dès l'ouverture, avant le calcul du hash
+PRELECTURE = 8 * 1024 * 1024
+# Jusqu'à ce nombre de fichiers, un groupe candidat est comparé bloc à bloc plutôt
+# que hashé: au-delà, trop de fichiers ouverts et de blocs en mémoire à la fois
+MAX_COMPARAISON_DIRECTE = 4
+
+# Taille de chacun des trois échantillons (début, milieu, fin) lus avant le hash
+TAILLE_ECHANTILLON = 4096
+# Jusqu'à cette taille, un fichier est lu en entier dès l'échantillonnage: une seule
+# lecture complète coûte moins qu'un échantillon suivi d'un hash complet
+TAILLE_LECTURE_COMPLETE = 64 * 1024
+
+# Par défaut, les fichiers plus petits sont ignorés: nombreux (fichiers vides,
+# petites configurations), leur suppression ne libère presque rien et peut casser
+# les programmes qui les attendent
+TAILLE_MIN = 4096
+
+# Cache persistant des empreintes, pour ne pas relire les fichiers inchangés
+CHEMIN_CACHE = Path.home() / ".cache" / "supprimer_doublons.db"
+# À augmenter à chaque changement de la table: un cache plus ancien est recréé
+VERSION_CACHE = 4
+# Une empreinte ni calculée ni relue depuis ce délai (en secondes) est oubliée
+DUREE_CACHE = 90 * 24 * 3600
+
+# Linux uniquement: ne pas mettre à jour la date d'accès des fichiers lus
+O_NOATIME = getattr(os, "O_NOATIME", 0)
+
+# En dessous de ce nombre de fichiers, le coût du pool de threads l'emporte
+SEUIL_PARALLELE = 4
+# blake3 et hashlib relâchent le GIL pendant update(): les threads se recouvrent sur les E/S
+NB_THREADS_HASH = min(32, (os.cpu_count() or 1) * 4)
+# Sur un disque rotatif, des lectures concurrentes multiplient les déplacements de la tête
+NB_THREADS_DISQUE_ROTATIF = 2
+# readdir relâche le GIL: plusieurs threads parcourent l'arborescence en parallèle
+NB_THREADS_PARCOURS = min(32, (os.cpu_count() or 1) * 4)
+
+# Fichier trouvé au parcours: (chemin, résultat du stat() fait au parcours). Le
+# chemin reste une chaîne: seuls les fichiers de taille partagée deviennent des Path
+Entree = tuple[str, os.stat_result]
+
+def grouper_par_cle(elements: list[tuple[Any, Path]]) -> Iterator[tuple[Any, list[Path]]]:
     """
-    Regroupe les fichiers par taille et élimine les tailles uniques.
+    Regroupe des couples (clé, fichier) par clé, après un tri de la liste sur place.
+    Seuls les groupes d'au moins deux fichiers sont renvoyés. Le tri est stable:
+    l'ordre des fichiers au sein d'un groupe est conservé.
     """
-    tailles = defaultdict(list)
+    elements.sort(key=itemgetter(0))
+    for cle, groupe in groupby(elements, key=itemgetter(0)):
+        fichiers = [fichier for _, fichier in groupe]
+        if len(fichiers) > 1:
+            yield cle, fichiers
 
-    for fichier in fichiers:
-        try:
-            taille = fichier.stat().st_size
-            tailles[taille].append(fichier)
-        except OSError:
+def cle_inode(fichier: str, st: os.stat_result) -> Any:
+    """
+    Retourne ce qui identifie le fichier lui-même, quel que soit le chemin qui y mène:
+    (périphérique, inode). DirEntry.stat() renvoie st_ino = 0 sous Windows: le chemin
+    résolu en tient lieu, ce qui couvre au moins les racines qui se recouvrent.
+    """
+    if st.st_ino:
+        return st.st_dev, st.st_ino
+    return os.path.normcase(os.path.realpath(fichier))
+
+def afficher_liens_physiques(liens_physiques: dict[str, list[str]], retrait: str = "   "):
+    """
+    Affiche les chemins écartés parce qu'ils mènent à un fichier déjà retenu.
+    """
+    for premier, alias in liens_physiques.items():
+        print(f"{retrait}↔ {premier}, aussi atteint par: {', '.join(alias)}")
+
+def espace_libere(taille: int, fichier: Path, stats: Optional[dict[Path, os.stat_result]]) -> int:
+    """
+    Retourne l'espace libéré par la suppression de fichier: rien s'il reste
+    d'autres liens physiques vers son contenu.
+    """
+    st = stats.get(fichier) if stats else None
+    return 0 if st is not None and st.st_nlink > 1 else taille
+
+def regrouper_par_taille(fichiers: Iterable[Entree],
+                         liens_physiques: Optional[dict[str, list[str]]] = None,
+                         stats: Optional[dict[Path, os.stat_result]] = None,
+                         taille_min: int = 0) -> tuple[dict[int, list[Path]], int]:
+    """
+    Regroupe par taille les fichiers d'au moins taille_min octets, au fil du parcours.
+    Retourne les groupes d'au moins deux fichiers distincts et le nombre de fichiers parcourus.
+    Un chemin vers un fichier déjà vu est ajouté à liens_physiques[premier chemin];
+    stats reçoit le stat() du parcours de chaque fichier gardé. Tous deux sont optionnels.
+    """
+    # Par taille partagée: {identité du fichier: entrée}, dans l'ordre du parcours.
+    # Une taille vue une seule fois ne coûte que son entrée dans premiers
+    groupes = {}
+    premiers = {}
+    nb_fichiers = 0
+    # Méthodes liées une fois pour toutes: la boucle tourne une fois par fichier
+    groupe_de_taille = groupes.get
+    premier_de_taille = premiers.setdefault
+    identite = cle_inode
+    # Progression sur stderr, dans un terminal seulement: une sortie redirigée n'en reçoit rien
+    afficher_progression = sys.stderr.isatty()
+
+    for nb_fichiers, entree in enumerate(fichiers, 1):
+        if afficher_progression and not nb_fichiers % 100:
+            sys.stderr.write(f"  Fichiers analysés: {nb_fichiers}...\r")
+            sys.stderr.flush()
+        fichier, st = entree
+        taille = st.st_size  # celle du stat() du parcours: aucun autre n'est fait ici
+        if taille < taille_min:
             continue
+        premier = premier_de_taille(taille, entree)
+        if premier is entree:
+            continue
+        # Liens physiques, racines répétées ou qui se recouvrent: un même fichier a
+        # forcément une seule taille, il suffit de le chercher parmi celle-ci
+        groupe = groupe_de_taille(taille)
+        if groupe is None:
+            groupe = groupes[taille] = {identite(*premier): premier}
+        deja_vu = groupe.setdefault(identite(fichier, st), entree)
+        if deja_vu is not entree:
+            if liens_physiques is not None:
+                liens_physiques.setdefault(deja_vu[0], []).append(fichier)
+    if afficher_progression and nb_fichiers >= 100:
+        # Efface la ligne de progression avant les messages qui suivent
+        sys.stderr.write(" " * len(f"  Fichiers analysés: {nb_fichiers}...") + "\r")
+        sys.stderr.flush()
 
-    # On ne garde que les tailles avec au moins deux fichiers
-    return {t: lst for t, lst in tailles.items() if len(lst) > 1}
+    resultat = {}
+    for taille, groupe in groupes.items():
+        if len(groupe) < 2:  # uniquement des chemins vers un même fichier
+            continue
+        # Un fichier qui a d'autres liens physiques passe en tête pour être conservé: le
+        # supprimer ne libérerait rien. Tri stable: l'ordre du parcours est gardé sinon
+        entrees = sorted(groupe.values(), key=lambda entree: entree[1].st_nlink <= 1)
+        chemins = resultat[taille] = [Path(fichier) for fichier, _ in entrees]
+        if stats is not None:
+            stats.update(zip(chemins, (st for _, st in entrees)))
+    return resultat, nb_fichiers
 
-def comparer_octets(groupes_par_taille: dict[int, list[Path]], x: int = 8) -> list[Path]:
+def ouvrir_lecture(fichier: Path) -> int:
     """
-    Compare les x premiers octets des fichiers de même taille.
-    Retourne la liste des fichiers candidats (non isolés).
+    Ouvre un fichier en lecture avec os.open, sans objet fichier Python.
+    O_NOATIME (Linux) évite de mettre à jour la date d'accès, mais n'est permis
+    qu'au propriétaire du fichier: sinon le fichier est ouvert normalement.
     """
+    drapeaux = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+    if O_NOATIME:
+        try:
+            return os.open(fichier, drapeaux | O_NOATIME)
+        except PermissionError:
+            pass
+    return os.open(fichier, drapeaux)
+
+if hasattr(os, "pread"):
+    pread = os.pread
+else:  # Windows
+    def pread(fd: int, n: int, position: int) -> bytes:
+        os.lseek(fd, position, os.SEEK_SET)
+        return os.read(fd, n)
+
+def lire_echantillon(fichier: Path, taille: int, n: int = TAILLE_ECHANTILLON,
+                     complet: bool = False) -> bytes:
+    """
+    Lit n octets au début, au milieu et à la fin d'un fichier.
+    Le fichier est lu en entier si complet est vrai ou s'il fait au plus 3n octets.
+    """
+    fd = ouvrir_lecture(fichier)
+    try:
+        if complet or taille <= 3 * n:
+            return pread(fd, taille, 0)
+        conseiller_lecture_aleatoire(fd)
+        return pread(fd, n, 0) + pread(fd, n, taille // 2 - n // 2) + pread(fd, n, taille - n)
+    finally:
+        os.close(fd)
+
+def empreinte_echantillon(fichier: Path, taille: int, n: int = TAILLE_ECHANTILLON) -> Optional[bytes]:
+    """
+    Calcule l'empreinte de l'échantillon d'un fichier, ou de tout son contenu s'il
+    fait au plus TAILLE_LECTURE_COMPLETE octets. Retourne None s'il ne peut pas être lu.
+    """
+    complet = taille <= max(3 * n, TAILLE_LECTURE_COMPLETE)
+    hasher = nouveau_hasher if complet else hasher_echantillon
+    try:
+        return hasher(lire_echantillon(fichier, taille, n, complet)).digest()
+    except OSError:
+        return None
+
+def comparer_octets(groupes_par_taille: dict[int, list[Path]],
+                    taille_echantillon: int = TAILLE_ECHANTILLON,
+                    nb_threads: int = NB_THREADS_HASH
+                    ) -> tuple[list[tuple[int, list[Path]]], list[tuple[int, list[Path]]]]:
+    """
+    Compare un échantillon (début, milieu, fin) des fichiers de même taille.
+    Beaucoup de formats partagent un long en-tête: le milieu et la fin
+    départagent bien plus de fichiers que les premiers octets seuls.
+
+    Les fichiers d'au plus TAILLE_LECTURE_COMPLETE octets sont lus en entier, et les
+    fichiers vides sont identiques sans rien lire. Les paires de fichiers plus grands
+    ne sont pas échantillonnées: elles restent candidates, et leur comparaison bloc à
+    bloc s'arrêtera d'elle-même à la première différence.
+    Les lectures sont faites sur nb_threads threads dès qu'il y a assez de fichiers.
+
+    Retourne deux listes de groupes avec leur taille: les doublons déjà confirmés
+    (fichiers assez petits pour avoir été lus en entier) et les candidats
+    restant à vérifier.
+    """
+    confirmes = []
     candidats = []
+    lecture_complete = max(3 * taille_echantillon, TAILLE_LECTURE_COMPLETE)
+    a_echantillonner = {}
+    for taille, fichiers in groupes_par_taille.items():
+        if taille == 0:
+            # Inutile d'ouvrir les fichiers vides: leur contenu est connu
+            confirmes.append((taille, fichiers))
+        elif len(fichiers) == 2 and taille > lecture_complete:
+            # L'échantillon coûterait une ouverture et trois lectures par fichier
+            # sans éviter la comparaison, qui commence par un petit bloc
+            candidats.append((taille, fichiers))
+        else:
+            a_echantillonner[taille] = fichiers
+    tailles = [taille for taille, fichiers in a_echantillonner.items() for _ in fichiers]
+    fichiers_a_lire = [fichier for fichiers in a_echantillonner.values() for fichier in fichiers]
 
-    for fichiers in groupes_par_taille.values():
-        octets_map = defaultdict(list)
+    # pread relâche le GIL: plusieurs lectures restent en attente à la fois dans la
+    # file du disque, au lieu d'une seule. map() rend les empreintes dans l'ordre.
+    with executeur(len(fichiers_a_lire), nb_threads) as executer:
+        empreintes = iter(executer(partial(empreinte_echantillon, n=taille_echantillon),
+                                   fichiers_a_lire, tailles))
 
-        for fichier in fichiers:
-            try:
-                with open(fichier, "rb") as f:
-                    prefixe = f.read(x)
-                octets_map[prefixe].append(fichier)
-            except OSError:
-                continue
+        for taille, fichiers in a_echantillonner.items():
+            echantillons = []
+            ajouter = echantillons.append
+            for fichier in fichiers:
+                empreinte = next(empreintes)
+                if empreinte is not None:
+                    ajouter((empreinte, fichier))
 
-        # On ne garde que les groupes avec doublons
-        for groupe in octets_map.values():
-            if len(groupe) > 1:
-                candidats.extend(groupe)
+            # On ne garde que les groupes avec doublons
+            complet = taille <= lecture_complete
+            for _, groupe in grouper_par_cle(echantillons):
+                (confirmes if complet else candidats).append((taille, groupe))
 
-    return candidats
+    return confirmes, candidats
 
-def comparer_hash(fichiers: list[Path]) -> list[list[Path]]:
+def conseiller_lecture_aleatoire(fd: int):
     """
-    Compare les hash des fichiers et retourne les vrais doublons.
+    Prévient le noyau que seuls quelques blocs dispersés d'un fichier seront lus:
+    sans cela, la lecture anticipée chargerait pour rien les pages qui les suivent.
+    Sans effet là où posix_fadvise n'existe pas (Windows, macOS).
     """
-    hash_map = defaultdict(list)
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_RANDOM)
+        except OSError:
+            pass
 
-    for fichier in fichiers:
+def conseiller_lecture_sequentielle(fd: int, precharger: bool = True):
+    """
+    Prévient le noyau qu'un fichier va être lu du début à la fin: fenêtre de
+    lecture anticipée agrandie et, si precharger est vrai, préchargement immédiat
+    du début. Sans effet là où posix_fadvise n'existe pas (Windows, macOS).
+    """
+    if hasattr(os, "posix_fadvise"):
         try:
-            hasher = hashlib.md5()
-            with open(fichier, "rb") as f:
-                while chunk := f.read(8192):
-                    hasher.update(chunk)
-            hash_map[hasher.hexdigest()].append(fichier)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            if precharger:
+                os.posix_fadvise(fd, 0, PRELECTURE, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+
+def liberer_cache_pages(fd: int):
+    """
+    Retire un fichier déjà lu du cache de pages: il ne sera pas relu, et les
+    pages utiles aux autres programmes ne sont pas évincées à sa place.
+    """
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
+# Tampons de lecture des hash, un par thread du pool: alloués une seule fois
+tampons_threads = threading.local()
+
+def tampon_lecture(taille: int) -> memoryview:
+    """
+    Retourne le tampon de lecture du thread appelant, de taille octets.
+    Il est alloué au premier appel du thread, puis réutilisé pour chaque fichier.
+    """
+    tampon = getattr(tampons_threads, "tampon", None)
+    if tampon is None or len(tampon) != taille:
+        tampon = tampons_threads.tampon = memoryview(bytearray(taille))
+    return tampon
+
+def hasher_contenu(f, fichier: Path, chunk_size: int) -> bytes:
+    """
+    Calcule l'empreinte du fichier déjà ouvert f, dont fichier est le chemin.
+    """
+    taille = os.fstat(f.fileno()).st_size
+    if blake3 is not None:
+        # Un gros fichier est aussi découpé entre plusieurs cœurs par blake3 lui-même;
+        # les autres restent sur un seul thread, le pool parallélise déjà entre fichiers
+        hasher = blake3.blake3(max_threads=blake3.blake3.AUTO if taille >= SEUIL_MMAP else 1)
+        # Même inode, même cache de pages: les conseils donnés sur f valent ici aussi
+        hasher.update_mmap(fichier)
+        return hasher.digest()
+    if taille >= SEUIL_MMAP:
+        # Toute la boucle tourne en C, hors GIL, sans copie vers un tampon Python
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as projection:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                projection.madvise(mmap.MADV_SEQUENTIAL)
+            hasher = nouveau_hasher()
+            hasher.update(projection)
+            return hasher.digest()
+    # Un seul tampon par thread, rempli sur place: pas de nouvel objet bytes à chaque
+    # bloc (hashlib.file_digest fait de même, mais par blocs de 256 Ko seulement)
+    hasher = nouveau_hasher()
+    tampon = tampon_lecture(chunk_size)
+    while n := f.readinto(tampon):
+        hasher.update(tampon[:n])
+    return hasher.digest()
+
+def calculer_hash_fichier(fichier: Path, chunk_size: int = TAILLE_BLOC) -> Optional[bytes]:
+    """
+    Calcule l'empreinte du contenu d'un fichier (128 bits minimum).
+    Retourne None si le fichier ne peut pas être lu.
+    """
+    try:
+        with open(fichier, "rb", buffering=0) as f:
+            conseiller_lecture_sequentielle(f.fileno())
+            try:
+                return hasher_contenu(f, fichier, chunk_size)
+            finally:
+                liberer_cache_pages(f.fileno())
+    except OSError as e:
+        print(f"Erreur lors de la lecture de {fichier}: {e}", file=sys.stderr)
+        return None
+
+def partitionner_par_blocs(groupe: list[Path], chunk_size: int = TAILLE_BLOC,
+                           empreintes: Optional[dict[Path, bytes]] = None) -> list[list[Path]]:
+    """
+    Compare les fichiers d'un petit groupe bloc par bloc, tous en même temps, et les
+    répartit en sous-groupes de contenu identique. Un fichier cesse d'être lu dès
+    qu'il ne partage plus son bloc avec aucun autre: moins de lectures que des hash
+    complets, et aucun calcul. L'ordre des fichiers est conservé.
+
+    Le premier bloc fait TAILLE_ECHANTILLON octets et chaque bloc suivant le double,
+    jusqu'à chunk_size: deux fichiers qui diffèrent dès le début sont écartés
+    après quelques Ko seulement.
+
+    Si empreintes est fourni, les blocs sont aussi hashés au fil de la lecture, et
+    il reçoit l'empreinte de chaque fichier lu jusqu'au bout, pour le cache.
+    Chaque fichier est lu dans son propre tampon, réalloué seulement quand la
+    taille des blocs double: pas de nouvel objet bytes à chaque bloc.
+    """
+    try:
+        with ExitStack() as pile:
+            ouverts = []
+            for fichier in groupe:
+                try:
+                    f = pile.enter_context(open(fichier, "rb"))
+                except OSError as e:
+                    print(f"Erreur lors de la lecture de {fichier}: {e}", file=sys.stderr)
+                    continue
+                # Lu une seule fois, du début jusqu'à la première différence: pas de
+                # préchargement, qui lirait 8 Mo même si tout se joue dans les premiers Ko
+                conseiller_lecture_sequentielle(f.fileno(), precharger=False)
+                pile.callback(liberer_cache_pages, f.fileno())
+                # [fichier ouvert, chemin, hasher, tampon du dernier bloc lu]
+                ouverts.append([f, fichier, hasher_complet() if empreintes is not None else None,
+                                bytearray()])
+            en_cours = [ouverts] if len(ouverts) > 1 else []
+            identiques = []
+            taille_bloc = TAILLE_ECHANTILLON
+            while en_cours:
+                suivants = []
+                for sous_groupe in en_cours:
+                    # Comparaison directe aux blocs déjà lus (memcmp, arrêtée au premier
+                    # octet différent) plutôt qu'un dictionnaire, qui hasherait chaque bloc.
+                    # Entre bytearray: comparer des memoryview se ferait octet par octet
+                    par_bloc = []
+                    for ouvert in sous_groupe:
+                        bloc = ouvert[3]
+                        if len(bloc) != taille_bloc:
+                            bloc = ouvert[3] = bytearray(taille_bloc)
+                        n = ouvert[0].readinto(bloc)
+                        if n < taille_bloc:  # fin du fichier: le tampon n'est rempli qu'en partie
+                            del bloc[n:]
+                        for reference, memes in par_bloc:
+                            if bloc == reference:
+                                memes.append(ouvert)
+                                break
+                        else:
+                            par_bloc.append((bloc, [ouvert]))
+                    for bloc, memes in par_bloc:
+                        if len(memes) < 2:
+                            continue
+                        # Seuls les fichiers encore comparés peuvent finir en cache
+                        for _, _, hasher, _ in memes:
+                            if hasher is not None:
+                                hasher.update(bloc)
+                        if len(bloc) == taille_bloc:
+                            suivants.append(memes)
+                        else:  # fin commune des fichiers: tous identiques
+                            identiques.append([fichier for _, fichier, _, _ in memes])
+                            if empreintes is not None:
+                                empreintes.update((fichier, hasher.digest()) for _, fichier, hasher, _ in memes)
+                en_cours = suivants
+                taille_bloc = min(2 * taille_bloc, chunk_size)
+            return identiques
+    except OSError as e:
+        print(f"Erreur lors de la comparaison de {', '.join(map(str, groupe))}: {e}", file=sys.stderr)
+        return []
+
+def disque_rotatif(chemin: Path) -> bool:
+    """
+    Indique si chemin est sur un disque rotatif, d'après /sys (Linux uniquement).
+    Retourne False si l'information n'est pas disponible.
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        st = os.stat(chemin)
+    except OSError:
+        return False
+    peripherique = f"/sys/dev/block/{os.major(st.st_dev)}:{os.minor(st.st_dev)}"
+    # Une partition n'a pas de file d'attente propre: celle du disque est au-dessus
+    for file_attente in ("queue/rotational", "../queue/rotational"):
+        try:
+            with open(os.path.join(peripherique, file_attente)) as f:
+                return f.read().strip() == "1"
         except OSError:
             continue
+    return False
 
-    # Chaque groupe contient uniquement de vrais doublons
-    return [groupe for groupe in hash_map.values() if len(groupe) > 1]
+def nb_threads_hash(repertoires: list[str]) -> int:
+    """
+    Nombre de fichiers lus et hashés en parallèle par défaut: NB_THREADS_DISQUE_ROTATIF
+    si l'un des répertoires est sur un disque rotatif, NB_THREADS_HASH sinon.
+    """
+    if any(disque_rotatif(Path(rep)) for rep in repertoires):
+        return NB_THREADS_DISQUE_ROTATIF
+    return NB_THREADS_HASH
+
+@contextmanager
+def executeur(nb_taches: int, nb_threads: int = NB_THREADS_HASH):
+    """
+    Fournit une fonction map(): celle d'un pool de nb_threads threads si nb_taches
+    justifie son coût, la fonction map() native sinon.
+    """
+    if nb_taches < SEUIL_PARALLELE or nb_threads <= 1:
+        yield map
+        return
+    with ThreadPoolExecutor(max_workers=nb_threads) as executor:
+        yield executor.map
+
+def ouvrir_cache(chemin: Path = CHEMIN_CACHE) -> Optional[sqlite3.Connection]:
+    """
+    Ouvre (ou crée) le cache des empreintes.
+    Retourne None si le cache ne peut pas être ouvert: le programme fonctionne sans.
+    """
+    try:
+        chemin.parent.mkdir(parents=True, exist_ok=True)
+        cache = sqlite3.connect(chemin)
+        cache.execute("PRAGMA journal_mode=WAL")
+        if cache.execute("PRAGMA user_version").fetchone()[0] != VERSION_CACHE:
+            # Version 1: empreintes en hexadécimal (TEXT), incomparables aux bytes actuels
+            # Version 2: pas de colonne vu_le, qui permet d'oublier les fichiers disparus
+            # Version 3: pas de colonne ctime_ns, seule date qu'un programme ne peut remettre
+            cache.execute("DROP TABLE IF EXISTS empreintes")
+            cache.execute(f"PRAGMA user_version = {VERSION_CACHE}")
+        cache.execute(
+            "CREATE TABLE IF NOT EXISTS empreintes ("
+            " peripherique INTEGER, inode INTEGER, algo TEXT,"
+            " mtime_ns INTEGER, ctime_ns INTEGER, taille INTEGER, empreinte BLOB, vu_le INTEGER,"
+            " PRIMARY KEY (peripherique, inode, algo))"
+        )
+        cache.execute("CREATE INDEX IF NOT EXISTS empreintes_vu_le ON empreintes (vu_le)")
+        return cache
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️  Cache des empreintes indisponible: {e}", file=sys.stderr)
+        return None
+
+def lire_hash_cache(cache: sqlite3.Connection, st: os.stat_result) -> Optional[bytes]:
+    """
+    Retourne l'empreinte connue d'un fichier, ou None s'il a changé depuis.
+    mtime peut être remise à sa valeur après une réécriture (cp -p, rsync -t,
+    touch -r): ctime, que seul le noyau fixe, doit aussi être inchangée.
+    """
+    if not st.st_ino:  # certains systèmes de fichiers n'ont pas d'inode stable
+        return None
+    try:
+        ligne = cache.execute(
+            "SELECT empreinte FROM empreintes WHERE peripherique = ? AND inode = ?"
+            " AND algo = ? AND mtime_ns = ? AND ctime_ns = ? AND taille = ?",
+            (st.st_dev, st.st_ino, ALGO_HASH, st.st_mtime_ns, st.st_ctime_ns, st.st_size)
+        ).fetchone()
+    except sqlite3.Error:
+        return None
+    return ligne[0] if ligne else None
+
+def enregistrer_hashes_cache(cache: sqlite3.Connection, entrees: list[tuple[os.stat_result, bytes]],
+                             relues: Iterable[os.stat_result] = ()):
+    """
+    Enregistre en une seule transaction les empreintes calculées, et la date
+    d'utilisation de celles relues. Les empreintes inutilisées depuis DUREE_CACHE
+    (fichiers supprimés, déplacés ou hors des analyses récentes) sont oubliées:
+    le cache ne grossit pas indéfiniment.
+    """
+    maintenant = int(time.time())
+    try:
+        cache.executemany(
+            "INSERT OR REPLACE INTO empreintes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(st.st_dev, st.st_ino, ALGO_HASH, st.st_mtime_ns, st.st_ctime_ns, st.st_size, empreinte,
+              maintenant)
+             for st, empreinte in entrees if st.st_ino]
+        )
+        cache.executemany(
+            "UPDATE empreintes SET vu_le = ? WHERE peripherique = ? AND inode = ? AND algo = ?",
+            [(maintenant, st.st_dev, st.st_ino, ALGO_HASH) for st in relues]
+        )
+        cache.execute("DELETE FROM empreintes WHERE vu_le < ?", (maintenant - DUREE_CACHE,))
+        cache.commit()
+    except sqlite3.Error as e:
+        print(f"⚠️  Impossible de mettre à jour le cache des empreintes: {e}", file=sys.stderr)
+
+def comparer_hash(candidats: list[tuple[int, list[Path]]],
+                  cache: Optional[sqlite3.Connection] = None,
+                  nb_threads: int = NB_THREADS_HASH,
+                  stats_parcours: Optional[dict[Path, os.stat_result]] = None
+                  ) -> Iterator[tuple[int, list[Path]]]:
+    """
+    Compare les hash des fichiers et renvoie les vrais doublons avec leur taille,
+    groupe par groupe, dès que les empreintes d'un groupe candidat sont connues.
+    Les groupes d'au plus MAX_COMPARAISON_DIRECTE fichiers sont comparés
+    directement, bloc à bloc; avec un cache, les blocs sont hashés au passage
+    pour qu'une paire inchangée se compare ensuite sans rien lire.
+    Les empreintes présentes dans le cache ne sont pas recalculées. Elles sont
+    recherchées avec les stat() du parcours (stats_parcours), s'ils sont fournis.
+    Les calculs sont faits sur nb_threads threads dès qu'il y a assez de fichiers.
+    """
+    stats = {}
+    connues = {}
+    relues = []
+    if cache is not None:
+        stats_parcours = stats_parcours or {}
+        for _, groupe in candidats:
+            for fichier in groupe:
+                st = stats_parcours.get(fichier)
+                # Sous Windows, DirEntry.stat() ne fournit pas l'inode: stat() complet
+                if st is None or not st.st_ino:
+                    try:
+                        st = fichier.stat()
+                    except OSError:
+                        continue
+                stats[fichier] = st
+                empreinte = lire_hash_cache(cache, st)
+                if empreinte is not None:
+                    connues[fichier] = empreinte
+                    relues.append(st)
+
+    # Un groupe dont toutes les empreintes sont connues se compare sans rien lire
+    directs = [(taille, groupe) for taille, groupe in candidats
+               if len(groupe) <= MAX_COMPARAISON_DIRECTE
+               and not all(fichier in connues for fichier in groupe)]
+    autres = [(taille, groupe) for taille, groupe in candidats
+              if len(groupe) > MAX_COMPARAISON_DIRECTE
+              or all(fichier in connues for fichier in groupe)]
+    a_calculer = [fichier for _, groupe in autres for fichier in groupe if fichier not in connues]
+    nouvelles = []
+    par_blocs = {} if cache is not None else None
+
+    # map() conserve l'ordre des fichiers: le fichier conservé reste le même, et les
+    # empreintes arrivent dans l'ordre des groupes, qui sont renvoyés un à un
+    with executeur(len(directs) + len(a_calculer), nb_threads) as executer:
+        partitions = executer(partial(partitionner_par_blocs, empreintes=par_blocs),
+                              [groupe for _, groupe in directs])
+        calculees = iter(executer(calculer_hash_fichier, a_calculer))
+        for (taille, _), identiques in zip(directs, partitions):
+            yield from ((taille, groupe) for groupe in identiques)
+
+        for taille, groupe in autres:
+            hashes = []
+            for fichier in groupe:
+                hash_fichier = connues.get(fichier)
+                if hash_fichier is None:
+                    hash_fichier = next(calculees)
+                    if hash_fichier is not None and fichier in stats:
+                        nouvelles.append((stats[fichier], hash_fichier))
+                if hash_fichier is not None:
+                    hashes.append((hash_fichier, fichier))
+            # Chaque groupe contient uniquement de vrais doublons
+            yield from ((taille, doublons) for _, doublons in grouper_par_cle(hashes))
+
+    if cache is not None:
+        nouvelles.extend((stats[fichier], empreinte) for fichier, empreinte in par_blocs.items()
+                         if fichier in stats)
+        enregistrer_hashes_cache(cache, nouvelles, relues)
+
+UNITES_TAILLE = ('o', 'Ko', 'Mo', 'Go', 'To', 'Po')
 
 def formater_taille(taille_octets: int) -> str:
     """
     Formate une taille en octets en format lisible (Ko, Mo, Go).
+    L'unité se déduit du nombre de bits de la taille: une seule division.
     """
-    for unite in ['o', 'Ko', 'Mo', 'Go', 'To']:
-        if taille_octets < 1024.0:
-            return f"{taille_octets:.2f} {unite}"
-        taille_octets /= 1024.0
-    return f"{taille_octets:.2f} Po"
+    indice = min(max(taille_octets.bit_length() - 1, 0) // 10, len(UNITES_TAILLE) - 1)
+    return f"{taille_octets / (1 << (10 * indice)):.2f} {UNITES_TAILLE[indice]}"
 
-def afficher_doublons(doublons: list[list[Path]]):
+def afficher_au_fil(doublons: Iterable[tuple[int, list[Path]]],
+                    stats: Optional[dict[Path, os.stat_result]] = None) -> Iterator[tuple[int, list[Path]]]:
     """
-    Affiche la liste des fichiers en double.
+    Affiche chaque groupe de fichiers en double dès qu'il est trouvé, puis le transmet.
+    
+    Seuls les totaux sont conservés: les groupes peuvent être traités au fur et à
+    mesure sans être tous gardés en mémoire. Le bilan est affiché après le dernier groupe.
     
     Args:
-        doublons: Liste de groupes de fichiers en double
-    """
-    if not doublons:
-        print("\nAucun doublon trouvé!")
-        return
+        doublons: Itérable de (taille, groupe de fichiers en double)
+        stats: stat() du parcours: un fichier qui a d'autres liens physiques
+            n'est pas compté dans l'espace récupérable
     
-    print(f"\n{len(doublons)} groupe(s) de fichiers en double trouvé(s):\n")
+    Yields:
+        Les groupes de fichiers en double, inchangés
+    """
+    nb_groupes = 0
     espace_total_recupere = 0
+    ecrire = sys.stdout.write
     
-    for i, groupe in enumerate(doublons, 1):
-        taille_fichier = groupe[0].stat().st_size
-        espace_groupe = taille_fichier * (len(groupe) - 1)
-        espace_total_recupere += espace_groupe
+    for taille_fichier, groupe in doublons:
+        if not nb_groupes:
+            print("\nFichiers en double trouvés:\n")
+        nb_groupes += 1
+        espace_total_recupere += sum(espace_libere(taille_fichier, doublon, stats) for doublon in groupe[1:])
         
-        print(f"Groupe {i} ({formater_taille(taille_fichier)} par fichier):")
-        print(f"  → Conserver: {groupe[0]}")
-        for doublon in groupe[1:]:
-            print(f"  ✗ Supprimer: {doublon}")
-        print()
+        # Une seule écriture par groupe plutôt qu'un print() par fichier
+        lignes = [f"Groupe {nb_groupes} ({formater_taille(taille_fichier)} par fichier):\n",
+                  f"  → Conserver: {groupe[0]}\n"]
+        lignes.extend(f"  ✗ Supprimer: {doublon}\n" for doublon in groupe[1:])
+        lignes.append("\n")
+        ecrire("".join(lignes))
+        yield taille_fichier, groupe
+    
+    if not nb_groupes:
+        print("\nAucun doublon trouvé!")
+        return
     
+    print(f"{nb_groupes} groupe(s) de fichiers en double trouvé(s).")
     print(f"Espace total qui peut être récupéré: {formater_taille(espace_total_recupere)}")
 
 
-def supprimer_doublons(doublons: list[list[Path]], confirmer: bool = True) -> tuple[int, int]:
+def afficher_doublons(doublons: Iterable[tuple[int, list[Path]]],
+                      stats: Optional[dict[Path, os.stat_result]] = None) -> int:
+    """
+    Affiche la liste des fichiers en double.
+    
+    Args:
+        doublons: Itérable de (taille, groupe de fichiers en double)
+        stats: stat() du parcours, voir afficher_au_fil
+    
+    Returns:
+        Nombre de groupes affichés
+    """
+    nb_groupes = 0
+    for nb_groupes, _ in enumerate(afficher_au_fil(doublons, stats), 1):
+        pass
+    return nb_groupes
+
+
+def supprimer_doublons(doublons: Iterable[tuple[int, list[Path]]], confirmer: bool = True,
+                       stats: Optional[dict[Path, os.stat_result]] = None) -> tuple[int, int]:
     """
     Supprime les fichiers en double.
     
     Args:
-        doublons: Liste de groupes de fichiers en double
+        doublons: Liste de (taille, groupe de fichiers en double). Sans confirmation,
+            un itérable suffit: chaque groupe est supprimé dès qu'il est reçu.
         confirmer: Si True, demande confirmation avant de supprimer
+        stats: stat() du parcours: supprimer un fichier qui a d'autres liens
+            physiques ne récupère aucun espace
     
     Returns:
         Nombre de fichiers supprimés, espace récupéré
@@ -125,42 +732,121 @@ def supprimer_doublons(doublons: list[list[Path]], confirmer: bool = True) -> tu
         return 0, 0
     
     if confirmer:
-        reponse = input(f"\nVoulez-vous supprimer {sum(len(g) - 1 for g in doublons)} fichier(s) en double? (o/n): ")
+        reponse = input(f"\nVoulez-vous supprimer {sum(len(g) - 1 for _, g in doublons)} fichier(s) en double? (o/n): ")
         if reponse.lower() not in ['o', 'oui', 'y', 'yes']:
             print("Suppression annulée.")
             return 0, 0
     
     fichiers_supprimes = 0
     espace_recupere = 0
+    ecrire = sys.stdout.write
     
-    for groupe in doublons:
-        taille_fichier = groupe[0].stat().st_size
+    for taille_fichier, groupe in doublons:
         # Conserver le premier fichier, supprimer les autres
+        supprimes = []
         for doublon in groupe[1:]:
             try:
-                espace_recupere += doublon.stat().st_size
                 doublon.unlink()
+                espace_recupere += espace_libere(taille_fichier, doublon, stats)
                 fichiers_supprimes += 1
-                print(f"✓ Supprimé: {doublon}")
+                supprimes.append(f"✓ Supprimé: {doublon}\n")
             except (OSError, IOError) as e:
                 print(f"✗ Erreur lors de la suppression de {doublon}: {e}", file=sys.stderr)
+        # Comme à l'affichage: une écriture par groupe
+        ecrire("".join(supprimes))
     
     return fichiers_supprimes, espace_recupere
 
 
-def enumerer_fichiers(repertoires: list[str], recursif: bool = True) -> list[Path]:
+def scanner_repertoire(repertoire: Path, recursif: bool = True) -> tuple[list[Entree], list[str]]:
     """
-    Énumère tous les fichiers dans les répertoires donnés.
+    Parcourt un répertoire et ses sous-répertoires avec os.scandir.
+    
+    Les sous-répertoires sont parcourus par le même thread, sauf ceux d'un
+    répertoire qui en contient au moins SEUIL_PARALLELE: ils sont renvoyés pour
+    être répartis sur le pool. Les liens symboliques ne sont pas suivis.
     
     Args:
-        repertoires: Liste des chemins de répertoires à parcourir
-        recursif: Si True, parcourt récursivement les sous-répertoires
+        repertoire: Chemin du répertoire à parcourir
+        recursif: Si False, les sous-répertoires sont ignorés
     
     Returns:
-        Liste de tous les fichiers trouvés
+        Fichiers trouvés, sous-répertoires à répartir
     """
     fichiers = []
+    a_repartir = []
+    pile = [repertoire]
+    # Noms locaux pour la boucle interne, exécutée une fois par entrée de répertoire
+    ajouter_fichier = fichiers.append
+    
+    while pile:
+        courant = pile.pop()
+        sous_repertoires = []
+        ajouter_sous_repertoire = sous_repertoires.append
+        try:
+            with os.scandir(courant) as entrees:
+                for entree in entrees:
+                    # DirEntry réutilise le type renvoyé par readdir: pas de stat() ici
+                    if entree.is_dir(follow_symlinks=False):
+                        ajouter_sous_repertoire(entree.path)
+                    elif entree.is_file(follow_symlinks=False):
+                        # Seul stat() du parcours, mis en cache par DirEntry. Sous Linux
+                        # c'est un vrai lstat(): le fichier a pu disparaître depuis readdir
+                        try:
+                            st = entree.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        ajouter_fichier((entree.path, st))
+        except OSError as e:
+            # Les sous-répertoires déjà lus avant l'erreur sont tout de même parcourus
+            print(f"⚠️  Impossible de lire '{courant}': {e}", file=sys.stderr)
+        
+        if not recursif:
+            break
+        if len(sous_repertoires) >= SEUIL_PARALLELE:
+            a_repartir.extend(sous_repertoires)
+        else:
+            pile.extend(reversed(sous_repertoires))
+    
+    return fichiers, a_repartir
+
+
+def lister_fichiers(racine: Path) -> Iterator[Entree]:
+    """
+    Liste tous les fichiers d'une arborescence avec un pool de threads.
+    
+    Les fichiers sont renvoyés dès que leur répertoire est lu, pendant que les
+    threads continuent le parcours: l'appelant les traite sans attendre la fin.
+    Les résultats sont lus dans l'ordre de soumission: l'ordre des fichiers, et donc
+    le fichier conservé dans chaque groupe, ne dépend pas de l'ordonnancement des threads.
+    
+    Args:
+        racine: Répertoire racine à parcourir
+    
+    Yields:
+        Fichiers trouvés
+    """
+    with ThreadPoolExecutor(max_workers=NB_THREADS_PARCOURS) as executor:
+        en_attente = deque([executor.submit(scanner_repertoire, racine)])
+        while en_attente:
+            trouves, a_repartir = en_attente.popleft().result()
+            # Soumis avant de rendre la main: le pool reste occupé pendant le traitement
+            en_attente.extend(executor.submit(scanner_repertoire, rep) for rep in a_repartir)
+            yield from trouves
+
+
+def enumerer_fichiers(repertoires: list[str], recursif: bool = True) -> Iterator[Entree]:
+    """
+    Énumère tous les fichiers dans les répertoires donnés, au fur et à mesure
+    du parcours: aucune liste de tous les fichiers n'est construite.
     
+    Args:
+        repertoires: Liste des chemins de répertoires à parcourir
+        recursif: Si True, parcourt récursivement les sous-répertoires
+    
+    Yields:
+        Chaque fichier trouvé, avec son stat()
+    """
     for rep in repertoires:
         chemin = Path(rep)
         
@@ -169,14 +855,12 @@ def enumerer_fichiers(repertoires: list[str], recursif: bool = True) -> list[Pat
             continue
         
         if chemin.is_file():
-            fichiers.append(chemin)
+            yield str(chemin), chemin.stat()
         elif chemin.is_dir():
             if recursif:
-                fichiers.extend([f for f in chemin.rglob('*') if f.is_file()])
+                yield from lister_fichiers(chemin)
             else:
-                fichiers.extend([f for f in chemin.glob('*') if f.is_file()])
-    
-    return fichiers
+                yield from scanner_repertoire(chemin, recursif=False)[0]
 
 
 def main():
@@ -212,19 +896,47 @@ def main():
         help='Ne pas parcourir récursivement les sous-répertoires'
     )
     
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=f"Ne pas utiliser le cache des empreintes ({CHEMIN_CACHE})"
+    )
+    
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        metavar='N',
+        help=f"Nombre de fichiers lus et hashés en parallèle (par défaut: {NB_THREADS_HASH}, "
+             f"{NB_THREADS_DISQUE_ROTATIF} sur un disque rotatif)"
+    )
+    
+    parser.add_argument(
+        '--min-size',
+        type=int,
+        default=TAILLE_MIN,
+        metavar='OCTETS',
+        help=f"Ignorer les fichiers de moins de OCTETS octets (par défaut: {TAILLE_MIN}, 0 pour tout analyser)"
+    )
+    
     args = parser.parse_args()
     
-    print("🔍 Énumération des fichiers...")
-    fichiers = enumerer_fichiers(args.repertoires, recursif=not args.non_recursive)
+    print("🔍 Énumération des fichiers et regroupement par taille...")
+    liens_physiques = {}
+    stats = {}
+    groupes_taille, nb_fichiers = regrouper_par_taille(
+        enumerer_fichiers(args.repertoires, recursif=not args.non_recursive), liens_physiques, stats,
+        taille_min=args.min_size)
     
-    if not fichiers:
+    if not nb_fichiers:
         print("Aucun fichier trouvé.")
         return
     
-    print(f"   {len(fichiers)} fichier(s) trouvé(s).")
-    
-    print("\n📊 Regroupement par taille...")
-    groupes_taille = regrouper_par_taille(fichiers)
+    print(f"   {nb_fichiers} fichier(s) trouvé(s).")
+    if liens_physiques:
+        nb_liens = sum(len(alias) for alias in liens_physiques.values())
+        print(f"   {nb_liens} chemin(s) ignoré(s) car menant à un fichier déjà trouvé "
+              f"(lien physique ou répertoires qui se recouvrent):")
+        afficher_liens_physiques(liens_physiques)
     nb_candidats_taille = sum(len(g) for g in groupes_taille.values())
     print(f"   {nb_candidats_taille} fichier(s) avec des tailles en commun.")
     
@@ -232,23 +944,38 @@ def main():
         print("\nAucun doublon trouvé!")
         return
     
-    print("\n🔬 Comparaison des premiers octets...")
-    candidats = comparer_octets(groupes_taille)
-    print(f"   {len(candidats)} candidat(s) potentiel(s).")
+    print("\n🔬 Comparaison d'échantillons (début, milieu, fin)...")
+    nb_threads = args.jobs or nb_threads_hash(args.repertoires)
+    confirmes, candidats = comparer_octets(groupes_taille, nb_threads=nb_threads)
+    print(f"   {sum(len(g) for _, g in confirmes)} petit(s) fichier(s) en double, lu(s) en entier.")
+    print(f"   {sum(len(g) for _, g in candidats)} candidat(s) potentiel(s).")
     
-    if not candidats:
+    if not confirmes and not candidats:
         print("\nAucun doublon trouvé!")
         return
     
-    print("\n🔐 Calcul des hash MD5...")
-    doublons = comparer_hash(candidats)
-    
-    afficher_doublons(doublons)
+    if candidats:
+        print(f"\n🔐 Calcul des empreintes {ALGO_HASH}...")
+    cache = None if args.no_cache or not candidats else ouvrir_cache()
+    nb_supprimes = espace = 0
+    try:
+        # Les groupes sont produits un à un: le cache doit rester ouvert jusqu'au dernier
+        doublons = chain(confirmes, comparer_hash(candidats, cache, nb_threads, stats))
+        if args.delete and args.yes:
+            # Sans confirmation, chaque groupe est supprimé dès qu'il est affiché
+            nb_supprimes, espace = supprimer_doublons(afficher_au_fil(doublons, stats), confirmer=False, stats=stats)
+        else:
+            if args.delete:
+                # La confirmation porte sur tous les groupes: ils sont gardés jusque-là
+                doublons = list(doublons)
+            if afficher_doublons(doublons, stats) and args.delete:
+                nb_supprimes, espace = supprimer_doublons(doublons, stats=stats)
+    finally:
+        if cache is not None:
+            cache.close()
     
-    if args.delete and doublons:
-        nb_supprimes, espace = supprimer_doublons(doublons, confirmer=not args.yes)
-        if nb_supprimes > 0:
-            print(f"\n✅ {nb_supprimes} fichier(s) supprimé(s), {formater_taille(espace)} récupéré(s).")
+    if nb_supprimes > 0:
+        print(f"\n✅ {nb_supprimes} fichier(s) supprimé(s), {formater_taille(espace)} récupéré(s).")
 
 
 if __name__ == "__main__":
@@ -2,52 +2,40 @@
 # -*- coding: utf-8 -*-
 """
 Programme pour supprimer les fichiers en double dans un ou plusieurs répertoires.
-Parcourt récursivement tous les sous-répertoires et identifie les doublons par leur contenu (hash MD5).
+Parcourt récursivement tous les sous-répertoires et identifie les doublons par leur contenu (empreinte BLAKE3, ou BLAKE2b à défaut).
 """
 
-import os
 import sys
-import hashlib
 import argparse
-from collections import defaultdict
 from pathlib import Path
 
-
-def calculer_hash_fichier(filepath, chunk_size=8192):
-    """
-    Calcule le hash MD5 d'un fichier.
-    
-    Args:
-        filepath: Chemin vers le fichier
-        chunk_size: Taille des blocs à lire (par défaut 8KB)
-    
-    Returns:
-        Hash MD5 du fichier en hexadécimal
+from supprimer_doublons import (
+    NB_THREADS_HASH,
+    TAILLE_MIN,
+    afficher_au_fil,
+    afficher_doublons,
+    afficher_liens_physiques,
+    comparer_hash,
+    comparer_octets,
+    formater_taille,
+    lister_fichiers,
+    nb_threads_hash,
+    ouvrir_cache,
+    regrouper_par_taille,
+    supprimer_doublons,
+)
+
+
+def lister_repertoires(repertoires):
     """
-    hash_md5 = hashlib.md5()
-    try:
-        with open(filepath, 'rb') as f:
-            while chunk := f.read(chunk_size):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
-    except (IOError, OSError) as e:
-        print(f"Erreur lors de la lecture de {filepath}: {e}", file=sys.stderr)
-        return None
-
-
-def parcourir_repertoires(repertoires):
-    """
-    Parcourt récursivement les répertoires et collecte tous les fichiers.
+    Énumère les fichiers des répertoires valides, au fur et à mesure du parcours.
     
     Args:
         repertoires: Liste des chemins de répertoires à parcourir
     
-    Returns:
-        Dictionnaire {hash: [liste des chemins de fichiers]}
+    Yields:
+        Chaque fichier trouvé, avec son stat()
     """
-    fichiers_par_hash = defaultdict(list)
-    fichiers_traites = 0
-    
     for repertoire in repertoires:
         repertoire_path = Path(repertoire)
         if not repertoire_path.exists():
@@ -61,118 +49,58 @@ def parcourir_repertoires(repertoires):
         print(f"Analyse du répertoire: {repertoire_path.absolute()}")
         
         # Parcourir récursivement tous les fichiers
-        for fichier_path in repertoire_path.rglob('*'):
-            if fichier_path.is_file():
-                fichiers_traites += 1
-                if fichiers_traites % 100 == 0:
-                    print(f"  Fichiers analysés: {fichiers_traites}...", end='\r')
-                
-                hash_fichier = calculer_hash_fichier(fichier_path)
-                if hash_fichier:
-                    fichiers_par_hash[hash_fichier].append(fichier_path)
-    
-    print(f"\nTotal de fichiers analysés: {fichiers_traites}")
-    return fichiers_par_hash
+        yield from lister_fichiers(repertoire_path)
 
 
-def identifier_doublons(fichiers_par_hash):
+def parcourir_repertoires(repertoires, taille_min=TAILLE_MIN):
     """
-    Identifie les fichiers en double (même hash).
+    Parcourt récursivement les répertoires et regroupe les fichiers par taille.
     
     Args:
-        fichiers_par_hash: Dictionnaire {hash: [liste des chemins]}
-    
-    Returns:
-        Liste de groupes de fichiers en double
-    """
-    doublons = []
-    for hash_fichier, chemins in fichiers_par_hash.items():
-        if len(chemins) > 1:
-            doublons.append(chemins)
-    return doublons
-
-
-def formater_taille(taille_octets):
-    """
-    Formate une taille en octets en format lisible.
-    
-    Args:
-        taille_octets: Taille en octets
+        repertoires: Liste des chemins de répertoires à parcourir
+        taille_min: Taille en octets en dessous de laquelle un fichier est ignoré
     
     Returns:
-        Chaîne formatée (ex: "1.5 MB")
-    """
-    for unite in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if taille_octets < 1024.0:
-            return f"{taille_octets:.2f} {unite}"
-        taille_octets /= 1024.0
-    return f"{taille_octets:.2f} PB"
-
-
-def afficher_doublons(doublons):
-    """
-    Affiche la liste des fichiers en double.
-    
-    Args:
-        doublons: Liste de groupes de fichiers en double
+        Dictionnaire {taille: [liste des chemins de fichiers]}, tailles uniques exclues,
+        et dictionnaire {chemin: stat() du parcours} de ces fichiers
     """
-    if not doublons:
-        print("\nAucun doublon trouvé!")
-        return
-    
-    print(f"\n{len(doublons)} groupe(s) de fichiers en double trouvé(s):\n")
-    espace_total_recupere = 0
-    
-    for i, groupe in enumerate(doublons, 1):
-        taille_fichier = groupe[0].stat().st_size
-        espace_groupe = taille_fichier * (len(groupe) - 1)
-        espace_total_recupere += espace_groupe
-        
-        print(f"Groupe {i} ({formater_taille(taille_fichier)} par fichier):")
-        print(f"  → Conserver: {groupe[0]}")
-        for doublon in groupe[1:]:
-            print(f"  ✗ Supprimer: {doublon}")
-        print()
-    
-    print(f"Espace total qui peut être récupéré: {formater_taille(espace_total_recupere)}")
-
-
-def supprimer_doublons(doublons, confirmer=True):
+    # Les fichiers sont regroupés dès leur découverte, sans liste de tous les fichiers
+    liens_physiques = {}
+    stats = {}
+    groupes_par_taille, nb_fichiers = regrouper_par_taille(lister_repertoires(repertoires), liens_physiques,
+                                                           stats, taille_min=taille_min)
+    
+    print(f"Total de fichiers analysés: {nb_fichiers}")
+    if liens_physiques:
+        nb_liens = sum(len(alias) for alias in liens_physiques.values())
+        print(f"Chemins ignorés car menant à un fichier déjà trouvé "
+              f"(lien physique ou répertoires qui se recouvrent): {nb_liens}")
+        afficher_liens_physiques(liens_physiques, retrait="  ")
+    return groupes_par_taille, stats
+
+
+def identifier_doublons(groupes_par_taille, utiliser_cache=True, nb_threads=NB_THREADS_HASH, stats=None):
     """
-    Supprime les fichiers en double.
+    Identifie les fichiers en double parmi les fichiers de même taille.
     
     Args:
-        doublons: Liste de groupes de fichiers en double
-        confirmer: Si True, demande confirmation avant de supprimer
+        groupes_par_taille: Dictionnaire {taille: [liste des chemins]}
+        utiliser_cache: Si True, réutilise les empreintes des analyses précédentes
+        nb_threads: Nombre de fichiers lus et hashés en parallèle
+        stats: Dictionnaire {chemin: stat() du parcours}, évite de refaire un stat() par fichier
     
-    Returns:
-        Nombre de fichiers supprimés, espace récupéré
+    Yields:
+        (taille, groupe de fichiers en double), au fur et à mesure de leur identification
     """
-    if not doublons:
-        return 0, 0
-    
-    if confirmer:
-        reponse = input(f"\nVoulez-vous supprimer {sum(len(g) - 1 for g in doublons)} fichier(s) en double? (o/n): ")
-        if reponse.lower() not in ['o', 'oui', 'y', 'yes']:
-            print("Suppression annulée.")
-            return 0, 0
-    
-    fichiers_supprimes = 0
-    espace_recupere = 0
-    
-    for groupe in doublons:
-        taille_fichier = groupe[0].stat().st_size
-        # Conserver le premier fichier, supprimer les autres
-        for doublon in groupe[1:]:
-            try:
-                espace_recupere += doublon.stat().st_size
-                doublon.unlink()
-                fichiers_supprimes += 1
-                print(f"✓ Supprimé: {doublon}")
-            except (OSError, IOError) as e:
-                print(f"✗ Erreur lors de la suppression de {doublon}: {e}", file=sys.stderr)
-    
-    return fichiers_supprimes, espace_recupere
+    confirmes, candidats = comparer_octets(groupes_par_taille, nb_threads=nb_threads)
+    yield from confirmes
+    if candidats:
+        cache = ouvrir_cache() if utiliser_cache else None
+        try:
+            yield from comparer_hash(candidats, cache, nb_threads, stats)
+        finally:
+            if cache is not None:
+                cache.close()
 
 
 def main():
@@ -208,30 +136,59 @@ Exemples:
         help='Affiche les doublons sans les supprimer'
     )
     
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="N'utilise pas le cache des empreintes des analyses précédentes"
+    )
+    
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        metavar='N',
+        help='Nombre de fichiers lus et hashés en parallèle (par défaut: selon les cœurs, 2 sur un disque rotatif)'
+    )
+    
+    parser.add_argument(
+        '--min-size',
+        type=int,
+        default=TAILLE_MIN,
+        metavar='OCTETS',
+        help=f'Ignore les fichiers de moins de OCTETS octets (par défaut: {TAILLE_MIN}, 0 pour tout analyser)'
+    )
+    
     args = parser.parse_args()
     
     print("=" * 60)
     print("  Programme de suppression de fichiers en double")
     print("=" * 60)
     
-    # Parcourir les répertoires et identifier les doublons
-    fichiers_par_hash = parcourir_repertoires(args.repertoires)
-    doublons = identifier_doublons(fichiers_par_hash)
-    
-    # Afficher les résultats
-    afficher_doublons(doublons)
-    
-    # Supprimer les doublons si demandé
-    if not args.dry_run and doublons:
-        confirmer = not args.no_confirm
-        fichiers_supprimes, espace_recupere = supprimer_doublons(doublons, confirmer=confirmer)
+    # Parcourir les répertoires et identifier les doublons, groupe par groupe
+    groupes_par_taille, stats = parcourir_repertoires(args.repertoires, taille_min=args.min_size)
+    nb_threads = args.jobs or nb_threads_hash(args.repertoires)
+    doublons = identifier_doublons(groupes_par_taille, utiliser_cache=not args.no_cache,
+                                   nb_threads=nb_threads, stats=stats)
+    fichiers_supprimes = espace_recupere = 0
+    
+    if not args.dry_run and args.no_confirm:
+        # Chaque groupe est supprimé dès qu'il est affiché
+        fichiers_supprimes, espace_recupere = supprimer_doublons(afficher_au_fil(doublons, stats), confirmer=False,
+                                                                 stats=stats)
+    else:
+        if not args.dry_run:
+            # La confirmation porte sur tous les groupes: ils sont gardés jusque-là
+            doublons = list(doublons)
         
-        if fichiers_supprimes > 0:
-            print(f"\n{'=' * 60}")
-            print(f"Résumé:")
-            print(f"  Fichiers supprimés: {fichiers_supprimes}")
-            print(f"  Espace récupéré: {formater_taille(espace_recupere)}")
-            print(f"{'=' * 60}")
+        # Afficher les résultats, puis supprimer les doublons si demandé
+        if afficher_doublons(doublons, stats) and not args.dry_run:
+            fichiers_supprimes, espace_recupere = supprimer_doublons(doublons, stats=stats)
+    
+    if fichiers_supprimes > 0:
+        print(f"\n{'=' * 60}")
+        print(f"Résumé:")
+        print(f"  Fichiers supprimés: {fichiers_supprimes}")
+        print(f"  Espace récupéré: {formater_taille(espace_recupere)}")
+        print(f"{'=' * 60}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Seuls des fichiers de contenu identique doivent être donnés pour doublons:
+échantillonnage, comparaison bloc à bloc, hash et cache des empreintes.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import supprimer_doublons
+from supprimer_doublons import (
+    MAX_COMPARAISON_DIRECTE,
+    TAILLE_LECTURE_COMPLETE,
+    comparer_hash,
+    comparer_octets,
+    enumerer_fichiers,
+    ouvrir_cache,
+    regrouper_par_taille,
+)
+
+# Plus grand que la lecture complète: seuls le début, le milieu et la fin sont échantillonnés
+TAILLE = 100_000
+# Hors des trois échantillons de TAILLE_ECHANTILLON octets
+HORS_ECHANTILLONS = 30_000
+
+
+class TestComparaison(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.racine = Path(self._tmp.name)
+        self.contenu = os.urandom(TAILLE)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def ecrire(self, nom, contenu=None, modifier_a=None):
+        contenu = bytearray(self.contenu if contenu is None else contenu)
+        if modifier_a is not None:
+            contenu[modifier_a] ^= 0xFF
+        (self.racine / nom).write_bytes(contenu)
+
+    def doublons(self, cache=None):
+        """
+        Groupes de doublons trouvés sous racine, par nom de fichier.
+        """
+        stats = {}
+        groupes, _ = regrouper_par_taille(enumerer_fichiers([str(self.racine)]), None, stats, taille_min=0)
+        confirmes, candidats = comparer_octets(groupes)
+        trouves = confirmes + list(comparer_hash(candidats, cache, stats_parcours=stats))
+        return sorted(sorted(fichier.name for fichier in groupe) for _, groupe in trouves)
+
+    def ouvrir_cache(self):
+        # Hors de la racine analysée: la base ne doit pas compter parmi les fichiers
+        repertoire = tempfile.TemporaryDirectory()
+        self.addCleanup(repertoire.cleanup)
+        cache = ouvrir_cache(Path(repertoire.name) / "empreintes.db")
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_paire_differente_hors_echantillons(self):
+        self.ecrire("a")
+        self.ecrire("b", modifier_a=HORS_ECHANTILLONS)
+        self.assertEqual(self.doublons(), [])
+
+    def test_grand_groupe_different_hors_echantillons(self):
+        noms = [f"f{i}" for i in range(MAX_COMPARAISON_DIRECTE + 2)]
+        for nom in noms[:-2]:
+            self.ecrire(nom)
+        self.ecrire(noms[-2], modifier_a=HORS_ECHANTILLONS)
+        self.ecrire(noms[-1], modifier_a=HORS_ECHANTILLONS + 1)
+        self.assertEqual(self.doublons(), [sorted(noms[:-2])])
+
+    def test_petits_fichiers_differents_au_dernier_octet(self):
+        for taille in (TAILLE_LECTURE_COMPLETE - 1, TAILLE_LECTURE_COMPLETE):
+            contenu = os.urandom(taille)
+            self.ecrire(f"a{taille}", contenu)
+            self.ecrire(f"b{taille}", contenu, modifier_a=taille - 1)
+            self.ecrire(f"c{taille}", contenu)
+        self.assertEqual(self.doublons(), [[f"a{TAILLE_LECTURE_COMPLETE - 1}", f"c{TAILLE_LECTURE_COMPLETE - 1}"],
+                                           [f"a{TAILLE_LECTURE_COMPLETE}", f"c{TAILLE_LECTURE_COMPLETE}"]])
+
+    def test_groupe_de_trois_dont_un_different(self):
+        self.ecrire("a")
+        self.ecrire("b", modifier_a=HORS_ECHANTILLONS)
+        self.ecrire("c")
+        self.assertEqual(self.doublons(), [["a", "c"]])
+
+    def verifier_cache_perime(self, nb_fichiers):
+        noms = [f"f{i}" for i in range(nb_fichiers)]
+        for nom in noms:
+            self.ecrire(nom)
+        cache = self.ouvrir_cache()
+        self.assertEqual(self.doublons(cache), [noms])
+
+        # Réécriture sur place, hors des échantillons, puis mtime remise
+        modifie = self.racine / noms[-1]
+        avant = modifie.stat()
+        with open(modifie, "r+b") as f:
+            f.seek(HORS_ECHANTILLONS)
+            f.write(b"modifie!")
+        os.utime(modifie, ns=(avant.st_atime_ns, avant.st_mtime_ns))
+        while modifie.stat().st_ctime_ns == avant.st_ctime_ns:
+            time.sleep(0.01)  # ctime n'avance qu'au rythme de l'horloge du noyau
+            os.utime(modifie, ns=(avant.st_atime_ns, avant.st_mtime_ns))
+
+        self.assertEqual(self.doublons(cache), [noms[:-1]] if nb_fichiers > 2 else [])
+
+    def test_cache_perime_malgre_mtime_remise_paire(self):
+        self.verifier_cache_perime(2)
+
+    def test_cache_perime_malgre_mtime_remise_groupe(self):
+        self.verifier_cache_perime(MAX_COMPARAISON_DIRECTE + 1)
+
+    def test_paire_en_cache_comparee_sans_lecture(self):
+        self.ecrire("a")
+        self.ecrire("b")
+        cache = self.ouvrir_cache()
+        self.assertEqual(self.doublons(cache), [["a", "b"]])
+        ne_pas_lire = mock.Mock(side_effect=AssertionError("fichier relu"))
+        with mock.patch.object(supprimer_doublons, "partitionner_par_blocs", ne_pas_lire), \
+                mock.patch.object(supprimer_doublons, "calculer_hash_fichier", ne_pas_lire):
+            self.assertEqual(self.doublons(cache), [["a", "b"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
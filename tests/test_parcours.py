@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Un fichier qui disparaît pendant le parcours ne doit écarter que lui-même,
+pas le reste de son répertoire ni ses sous-répertoires.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import supprimer_doublons
+from supprimer_doublons import enumerer_fichiers
+
+
+class EntreeDisparue:
+    """
+    DirEntry dont le fichier a été supprimé entre readdir et stat().
+    """
+
+    def __init__(self, entree):
+        self._entree = entree
+        self.path = entree.path
+        self.name = entree.name
+
+    def is_dir(self, follow_symlinks=True):
+        return False
+
+    def is_file(self, follow_symlinks=True):
+        return True
+
+    def stat(self, follow_symlinks=True):
+        raise FileNotFoundError(self.path)
+
+
+class TestFichierDisparu(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.racine = Path(self._tmp.name)
+        (self.racine / "sub").mkdir()
+        for nom in ("a", "b", "disparu", "sub/e"):
+            (self.racine / nom).write_bytes(b"x")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_seul_le_fichier_disparu_est_ecarte(self):
+        scandir = os.scandir
+
+        class Scandir:
+            def __init__(self, chemin):
+                self._it = scandir(chemin)
+
+            def __enter__(self):
+                return (EntreeDisparue(e) if e.name == "disparu" else e for e in self._it)
+
+            def __exit__(self, *exc):
+                self._it.close()
+
+        with mock.patch.object(supprimer_doublons.os, "scandir", Scandir):
+            trouves = sorted(os.path.relpath(chemin, self.racine)
+                             for chemin, _ in enumerer_fichiers([str(self.racine)]))
+        self.assertEqual(trouves, ["a", "b", os.path.join("sub", "e")])
+
+
+if __name__ == "__main__":
+    unittest.main()
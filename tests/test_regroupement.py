@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Un même fichier atteint par plusieurs chemins ne doit jamais former un groupe
+de doublons avec lui-même: il serait supprimé, et son contenu perdu.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from supprimer_doublons import (
+    enumerer_fichiers,
+    espace_libere,
+    regrouper_par_taille,
+)
+
+
+class TestMemeFichier(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.racine = Path(self._tmp.name)
+        self.sous = self.racine / "sous"
+        self.sous.mkdir()
+        self.fichier = self.sous / "unique.bin"
+        self.fichier.write_bytes(b"contenu unique" * 1000)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def regrouper(self, *racines):
+        liens = {}
+        groupes, _ = regrouper_par_taille(enumerer_fichiers([str(r) for r in racines]), liens, taille_min=0)
+        return groupes, liens
+
+    def test_racine_donnee_deux_fois(self):
+        groupes, liens = self.regrouper(self.racine, self.racine)
+        self.assertEqual(groupes, {})
+        self.assertEqual(sum(len(alias) for alias in liens.values()), 1)
+
+    def test_racines_qui_se_recouvrent(self):
+        groupes, liens = self.regrouper(self.racine, self.sous)
+        self.assertEqual(groupes, {})
+        self.assertEqual(liens, {str(self.fichier): [str(self.fichier)]})
+
+    def test_fichier_donne_dans_un_repertoire_donne(self):
+        groupes, _ = self.regrouper(self.sous, self.fichier)
+        self.assertEqual(groupes, {})
+
+    @unittest.skipUnless(hasattr(os, "link"), "liens physiques non disponibles")
+    def test_lien_physique(self):
+        os.link(self.fichier, self.racine / "lien.bin")
+        groupes, _ = self.regrouper(self.racine)
+        self.assertEqual(groupes, {})
+
+    def test_vrai_doublon_toujours_trouve(self):
+        copie = self.racine / "copie.bin"
+        copie.write_bytes(self.fichier.read_bytes())
+        groupes, _ = self.regrouper(self.racine, self.sous)
+        self.assertEqual([sorted(g) for g in groupes.values()], [sorted([copie, self.fichier])])
+
+    @unittest.skipUnless(hasattr(os, "link"), "liens physiques non disponibles")
+    def test_fichier_multi_lie_conserve_et_non_compte(self):
+        copie = self.racine / "copie.bin"
+        copie.write_bytes(self.fichier.read_bytes())
+        ailleurs = tempfile.TemporaryDirectory()
+        self.addCleanup(ailleurs.cleanup)
+        # Lien hors de l'analyse: supprimer self.fichier ne libérerait rien
+        os.link(self.fichier, Path(ailleurs.name) / "lien.bin")
+        stats = {}
+        groupes, _ = regrouper_par_taille(enumerer_fichiers([str(self.racine)]), None, stats, taille_min=0)
+        (taille, groupe), = groupes.items()
+        self.assertEqual(groupe[0], self.fichier)
+        self.assertEqual(espace_libere(taille, self.fichier, stats), 0)
+        self.assertEqual(espace_libere(taille, copie, stats), taille)
+
+
+if __name__ == "__main__":
+    unittest.main()